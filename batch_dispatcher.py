@@ -0,0 +1,286 @@
+# batch_dispatcher.py
+from models import UserQuery, ProcessorResult
+from processor import Processor
+from config import settings
+from cachetools import TTLCache
+import asyncio
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Batch API statuses after which a batch no longer changes
+TERMINAL_BATCH_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+def completion_window_ms() -> int:
+    """Batch completion window (e.g. "24h") in milliseconds."""
+    return int(settings.batch_completion_window.rstrip("h")) * 3_600_000
+
+class BatchJob:
+    """One query submitted to the Batch API"""
+    
+    def __init__(self, item: UserQuery, future: asyncio.Future):
+        self.item = item
+        self.future = future  # Resolves to ProcessorResult or RuntimeError
+        self.submitted_ns = time.perf_counter_ns()
+        self.completed_ns: int | None = None
+
+class BatchDispatcher:
+    """
+    Pools non-interactive queries into OpenAI Batch API jobs.
+    
+    Flow:
+    - submit() builds the request body from a prepared prompt, queues it
+      and returns immediately
+    - Background task flushes the queue when batch_min_size items are
+      pending or batch_window_ms has elapsed; a flush takes everything
+      queued at that moment (up to batch_max_size per file)
+    - Each flush uploads one JSONL file, creates one batch, polls it,
+      and resolves the BatchJob of each item
+    - Callers look up results by query_id with get()
+    
+    Jobs are held in memory only: a restart loses pending results.
+    """
+    
+    def __init__(self, processor: Processor):
+        self.processor = processor
+        self.client = processor.client
+        self.process_step = "2_batch_dispatcher"
+        
+        self._queue: asyncio.Queue | None = None  # Created on the running event loop
+        self._worker: asyncio.Task | None = None
+        self._batches: set[asyncio.Task] = set()  # Keep references to in-flight batches
+        self._closing = False
+        
+        # Results stay retrievable for batch_results_ttl seconds after submission
+        self._jobs = TTLCache(
+            maxsize=settings.batch_results_maxsize,
+            ttl=settings.batch_results_ttl
+        )
+    
+    def submit(self, item: UserQuery, user_prompt: str, context_docs: list[str]) -> None:
+        """
+        Queue a query for the next batch.
+        
+        Args:
+            item: Validated user query
+            user_prompt: Final user prompt (from Processor.build_prompt)
+            context_docs: Retrieved context documents (returned as sources)
+            
+        Raises:
+            RuntimeError: If the dispatcher is closed
+        """
+        if self._closing:
+            raise RuntimeError("Batch dispatcher stopped")
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        
+        future = asyncio.get_running_loop().create_future()
+        # Mark errors as retrieved: callers may never poll a failed job
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        
+        job = BatchJob(item, future)
+        self._jobs[item.query_id] = job
+        self._queue.put_nowait(
+            (job, self.processor.build_request(user_prompt), context_docs)
+        )
+    
+    async def close(self) -> None:
+        """Cancel the collector and in-flight batches (their jobs fail)."""
+        # Checked by _run: wait_for may swallow a cancel that races a queue.get
+        self._closing = True
+        tasks = list(self._batches)
+        if self._worker is not None:
+            tasks.append(self._worker)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._worker = None
+    
+    def get(self, query_id: str) -> BatchJob | None:
+        """
+        Look up a submitted query.
+        
+        Args:
+            query_id: ID returned when the query was submitted
+            
+        Returns:
+            BatchJob, or None if unknown or expired
+        """
+        return self._jobs.get(query_id)
+    
+    async def _run(self) -> None:
+        """Collect queued items into batches until closed."""
+        loop = asyncio.get_running_loop()
+        window_s = settings.batch_window_ms / 1000
+        pending = []
+        
+        try:
+            while not self._closing:
+                pending = [await self._queue.get()]
+                deadline = loop.time() + window_s
+                
+                # Wait until the size or the window trigger fires
+                while len(pending) + self._queue.qsize() < settings.batch_min_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0 or self._closing:
+                        break
+                    try:
+                        pending.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                
+                if self._closing:
+                    break
+                
+                # Drain the queue into this batch
+                while len(pending) < settings.batch_max_size:
+                    try:
+                        pending.append(self._queue.get_nowait())
+                    except asyncio.QueueEmpty:
+                        break
+                
+                # Batches run for minutes to hours: don't block collection of the next one
+                task = asyncio.create_task(self._dispatch(pending))
+                self._batches.add(task)
+                task.add_done_callback(self._batches.discard)
+                pending = []
+        finally:
+            # Fail items that were collected or queued but never dispatched
+            while True:
+                try:
+                    pending.append(self._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            for job, _, _ in pending:
+                self._resolve(job, RuntimeError("Batch dispatcher stopped"))
+    
+    @staticmethod
+    def _resolve(job: BatchJob, result: ProcessorResult | RuntimeError) -> None:
+        """Complete a job with its result or error."""
+        if job.future.done():
+            return
+        job.completed_ns = time.perf_counter_ns()
+        if isinstance(result, RuntimeError):
+            job.future.set_exception(result)
+        else:
+            job.future.set_result(result)
+    
+    async def _dispatch(self, pending: list[tuple]) -> None:
+        """Run one batch job and resolve the BatchJobs of its items."""
+        try:
+            outputs = await self._run_batch(pending)
+        except asyncio.CancelledError:
+            for job, _, _ in pending:
+                self._resolve(job, RuntimeError("Batch dispatcher stopped"))
+            raise
+        except Exception as e:
+            logger.error(
+                "Batch job failed",
+                extra={
+                    "process_step": self.process_step,
+                    "batch_size": len(pending)
+                },
+                exc_info=True
+            )
+            for job, _, _ in pending:
+                self._resolve(job, RuntimeError("Error in LLM batch response"))
+            return
+        
+        for job, _, context_docs in pending:
+            query_id = job.item.query_id
+            try:
+                content = outputs[query_id]["response"]["body"]["choices"][0]["message"]["content"]
+            except (KeyError, IndexError, TypeError):
+                logger.error(
+                    "Failed to parse LLM batch response",
+                    extra={
+                        "process_step": self.process_step,
+                        "query_id": query_id
+                    }
+                )
+                self._resolve(job, RuntimeError("Error parsing LLM response"))
+                continue
+            
+            try:
+                answer = self.processor.parse_answer(content, query_id)
+            except RuntimeError as e:
+                self._resolve(job, e)
+                continue
+            
+            self._resolve(
+                job,
+                ProcessorResult(
+                    query_id=query_id,
+                    answer=answer,
+                    sources_used=context_docs
+                )
+            )
+    
+    async def _run_batch(self, pending: list[tuple]) -> dict[str, dict]:
+        """
+        Upload, create and poll one batch job.
+        
+        Args:
+            pending: Queued (job, request body, context docs) tuples
+        
+        Returns:
+            Batch output lines keyed by custom_id (query_id)
+        
+        Raises:
+            RuntimeError: If the batch does not complete
+        """
+        lines = [
+            json.dumps({
+                "custom_id": job.item.query_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": body
+            })
+            for job, body, _ in pending
+        ]
+        
+        batch_file = await self.client.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch"
+        )
+        batch = await self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window=settings.batch_completion_window
+        )
+        
+        logger.info(
+            "Batch submitted",
+            extra={
+                "process_step": self.process_step,
+                "batch_id": batch.id,
+                "batch_size": len(pending)
+            }
+        )
+        
+        while batch.status not in TERMINAL_BATCH_STATUSES:
+            await asyncio.sleep(settings.batch_poll_interval_s)
+            batch = await self.client.batches.retrieve(batch.id)
+        
+        if batch.status != "completed" or batch.output_file_id is None:
+            raise RuntimeError(f"Batch {batch.id} ended with status {batch.status}")
+        
+        output = (await self.client.files.content(batch.output_file_id)).text
+        
+        logger.info(
+            "Batch completed",
+            extra={
+                "process_step": self.process_step,
+                "batch_id": batch.id
+            }
+        )
+        
+        outputs = {}
+        for line in output.splitlines():
+            if line:
+                result = json.loads(line)
+                outputs[result["custom_id"]] = result
+        return outputs
@@ -0,0 +1,36 @@
+# clients.py
+from openai import AsyncOpenAI
+from config import settings
+import importlib.util
+import logging
+import httpx
+
+logger = logging.getLogger(__name__)
+
+def create_async_client() -> AsyncOpenAI:
+    """
+    Create async OpenAI client with a pooled HTTP/2 transport.
+    
+    Built once per worker by Pipeline and shared by all components.
+    A large connection pool lets one worker keep many LLM calls
+    in flight on the event loop instead of one per thread. HTTP/2
+    multiplexes those calls over few TCP+TLS connections; it needs
+    the h2 package (httpx[http2]), without it HTTP/1.1 is used.
+    
+    Returns:
+        AsyncOpenAI client
+    """
+    http2 = importlib.util.find_spec("h2") is not None
+    if not http2:
+        logger.warning(
+            "h2 not installed, falling back to HTTP/1.1 (pip install 'httpx[http2]')"
+        )
+    
+    http_client = httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections
+        )
+    )
+    return AsyncOpenAI(api_key=settings.openai_api_key, http_client=http_client)
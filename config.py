@@ -12,15 +12,45 @@ class Settings(BaseSettings):
     model_name: str = "gpt-4o-mini"
     temperature: float = 0.7
     max_tokens: int = 1000
+    embedding_model: str = "text-embedding-3-small"
+    embedding_cache_dir: str = ".cache/embeddings"  # Persistent embedding cache
+    embedding_memory_cache_maxsize: int = 10_000  # In-memory LRU in front of the disk cache
+    embedding_max_input_tokens: int = 8191  # Longer inputs are truncated before embedding
+    embedding_max_batch_tokens: int = 300_000  # Token limit per embeddings request
+    
+    # ==================== HTTP Settings ====================
+    http_max_connections: int = 200  # Concurrent in-flight OpenAI requests
+    http_max_keepalive_connections: int = 100
     
     # ==================== Validation Settings ====================
-    min_query_length: int = 3
+    min_query_length: int = Field(default=3, gt=0)  # Validator skips the model check: keeps empty queries out
     max_query_length: int = 2000
     
     # ==================== Retrieval Settings (Optional) ====================
     enable_retrieval: bool = False  # Toggle RAG on/off
     knowledge_base_path: str = "data/faq.jsonl"
     top_k: int = 3  # Number of documents to retrieve
+    retrieval_backend: str = "faiss"  # "faiss" (semantic, HNSW) or "tfidf" (keyword)
+    hnsw_m: int = 32  # Graph neighbors per node
+    hnsw_ef_construction: int = 200
+    hnsw_ef_search: int = 64
+    
+    # ==================== Caching Settings ====================
+    response_cache_maxsize: int = 10_000  # Exact-match LLM response cache entries
+    response_cache_ttl: int = 3600  # Seconds before a cached response expires
+    enable_semantic_cache: bool = False  # Toggle embedding-based query cache on/off
+    semantic_cache_threshold: float = 0.95  # Minimum cosine similarity for a hit
+    semantic_cache_maxsize: int = Field(default=10_000, gt=0)
+    semantic_cache_ttl: int = Field(default=3600, gt=0)  # Seconds before a cached result expires
+    
+    # ==================== Batch Settings ====================
+    batch_min_size: int = 10  # Flush queue into a batch job at this many queries
+    batch_window_ms: int = 30000  # ...or after this long, whichever comes first
+    batch_max_size: int = 50_000  # Batch API limit of requests per input file
+    batch_completion_window: str = "24h"  # Lower latency budgets bypass the Batch API
+    batch_results_ttl: int = 172_800  # Seconds a submitted query's result stays retrievable
+    batch_results_maxsize: int = 1_000_000
+    batch_poll_interval_s: float = 30.0
     
     # ==================== Processing Settings ====================
     processing_mode: str = "default"  # Future: "fast", "accurate", etc.
@@ -0,0 +1,188 @@
+# embedder.py
+from openai import AsyncOpenAI, OpenAI
+from config import settings
+from cachetools import LRUCache
+from diskcache import Cache
+import asyncio
+import hashlib
+import logging
+import numpy as np
+import tiktoken
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of inputs per embeddings API request
+EMBEDDING_BATCH_SIZE = 2048
+
+class Embedder:
+    """
+    Embedding client with a persistent exact-match cache.
+    
+    Embeddings are stored on disk as float32 arrays keyed by
+    SHA256 of model name and text, so they survive restarts.
+    An in-memory LRU sits in front; disk reads/writes on the request
+    path run in a worker thread to keep SQLite off the event loop.
+    
+    Used by:
+    - SemanticCache (query embeddings)
+    - Processor (FAISS retrieval: document and query embeddings)
+    """
+    
+    def __init__(self, client: AsyncOpenAI):
+        self.client = client  # Shared with Processor
+        self.process_step = "0_embedder"
+        
+        # Exact-match cache: identical texts are embedded only once
+        # (diskcache is thread- and process-safe, no lock needed)
+        self._cache = Cache(settings.embedding_cache_dir)
+        self._memory = LRUCache(maxsize=settings.embedding_memory_cache_maxsize)
+        
+        # Tokenizer for batching and truncating by the API's token limits
+        # (loaded on first use: tiktoken may download its vocabulary)
+        self._encoding = None
+    
+    @staticmethod
+    def _cache_key(text: str) -> str:
+        """SHA256 of model name and text (different models never share entries)."""
+        return hashlib.sha256(f"{settings.embedding_model}\n{text}".encode()).hexdigest()
+    
+    async def embed(self, text: str) -> np.ndarray:
+        """
+        Embed a single text.
+        
+        Args:
+            text: Text to embed
+            
+        Returns:
+            float32 embedding vector
+            
+        Raises:
+            RuntimeError: If embedding API call fails
+        """
+        key = self._cache_key(text)
+        cached = self._memory.get(key)
+        if cached is not None:
+            return cached
+        
+        cached = await asyncio.to_thread(self._cache.get, key)
+        if cached is not None:
+            self._memory[key] = cached
+            return cached
+        
+        try:
+            response = await self.client.embeddings.create(
+                model=settings.embedding_model,
+                input=text
+            )
+            embedding = np.asarray(response.data[0].embedding, dtype=np.float32)
+        except Exception as e:
+            logger.error(
+                "Embedding API call failed",
+                extra={"process_step": self.process_step},
+                exc_info=True
+            )
+            raise RuntimeError("Error in embedding API response") from e
+        
+        self._memory[key] = embedding
+        await asyncio.to_thread(self._cache.set, key, embedding)
+        
+        return embedding
+    
+    def embed_many(self, texts: list[str]) -> np.ndarray:
+        """
+        Embed many texts, batching uncached ones into as few API calls as possible.
+        
+        Batches respect both the item limit (EMBEDDING_BATCH_SIZE) and the
+        token limit per request; texts over the per-input token limit are
+        truncated (the cache key still uses the full text).
+        
+        Blocking: intended for startup (e.g. indexing the knowledge base).
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            float32 array of shape (len(texts), dimensions)
+            
+        Raises:
+            RuntimeError: If embedding API call fails
+        """
+        keys = [self._cache_key(text) for text in texts]
+        embeddings = [self._cache.get(key) for key in keys]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        
+        if missing:
+            # Short-lived sync client: closed again once startup indexing is done
+            with OpenAI(api_key=settings.openai_api_key) as sync_client:
+                for batch, inputs in self._batches(texts, missing):
+                    try:
+                        response = sync_client.embeddings.create(
+                            model=settings.embedding_model,
+                            input=inputs
+                        )
+                    except Exception as e:
+                        logger.error(
+                            "Embedding API call failed",
+                            extra={
+                                "process_step": self.process_step,
+                                "batch_size": len(batch)
+                            },
+                            exc_info=True
+                        )
+                        raise RuntimeError("Error in embedding API response") from e
+                    
+                    for i, data in zip(batch, response.data):
+                        embeddings[i] = np.asarray(data.embedding, dtype=np.float32)
+                        self._cache[keys[i]] = embeddings[i]
+        
+        return np.vstack(embeddings) if embeddings else np.empty((0, 0), dtype=np.float32)
+    
+    def close(self) -> None:
+        """Close the persistent cache (the shared API client is closed by Pipeline)."""
+        self._cache.close()
+    
+    def _batches(self, texts: list[str], indices: list[int]):
+        """
+        Group texts into embeddings requests within the API limits.
+        
+        Yields:
+            Tuples of (indices into texts, input strings for one request)
+        """
+        if self._encoding is None:
+            try:
+                self._encoding = tiktoken.encoding_for_model(settings.embedding_model)
+            except KeyError:
+                self._encoding = tiktoken.get_encoding("cl100k_base")
+        
+        max_input = settings.embedding_max_input_tokens
+        max_batch = settings.embedding_max_batch_tokens
+        
+        batch, inputs, batch_tokens = [], [], 0
+        for i in indices:
+            tokens = self._encoding.encode(texts[i])
+            text = texts[i]
+            if len(tokens) > max_input:
+                logger.warning(
+                    "Truncated text over embedding token limit",
+                    extra={
+                        "process_step": self.process_step,
+                        "tokens": len(tokens),
+                        "limit": max_input
+                    }
+                )
+                tokens = tokens[:max_input]
+                text = self._encoding.decode(tokens)
+            
+            if batch and (
+                len(batch) == EMBEDDING_BATCH_SIZE
+                or batch_tokens + len(tokens) > max_batch
+            ):
+                yield batch, inputs
+                batch, inputs, batch_tokens = [], [], 0
+            
+            batch.append(i)
+            inputs.append(text)
+            batch_tokens += len(tokens)
+        
+        if batch:
+            yield batch, inputs
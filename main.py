@@ -1,8 +1,10 @@
 # main.py
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from pipeline import Pipeline
+from models import BatchSubmission, BatchItemStatus
+import functools
 import logging
 
 # ==================== Logging Setup ====================
@@ -44,16 +46,32 @@ class QueryRequest(BaseModel):
             }
         }
 
+class BatchQueryRequest(BaseModel):
+    """API request schema for batch processing"""
+    queries: list[str]
+    latency_budget_ms: int
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "queries": [
+                    "How do I reset my password?",
+                    "How do I delete my account?"
+                ],
+                "latency_budget_ms": 86_400_000
+            }
+        }
+
 # ==================== Dependency Injection ====================
 
+@functools.lru_cache(maxsize=1)
 def get_pipeline() -> Pipeline:
     """
     Dependency injection for pipeline.
-    Creates singleton pipeline instance.
+    Creates singleton pipeline instance (cached after the first call,
+    which happens in the startup event before any request is served).
     """
-    if not hasattr(get_pipeline, "instance"):
-        get_pipeline.instance = Pipeline()
-    return get_pipeline.instance
+    return Pipeline()
 
 # ==================== API Endpoints ====================
 
@@ -75,10 +93,7 @@ async def health_check():
     }
 
 @app.post("/process")
-async def process_query(
-    request: QueryRequest,
-    pipeline: Pipeline = Depends(get_pipeline)
-):
+async def process_query(request: QueryRequest):
     """
     Process user query through pipeline.
     
@@ -89,15 +104,55 @@ async def process_query(
     No manual try/except needed - FastAPI handles it.
     """
     
-    logger.info(f"Received query: {request.query[:50]}...")
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(f"Received query: {request.query[:50]}...")
     
     # Process through pipeline
     # Exceptions automatically converted to HTTP responses by FastAPI
-    result = pipeline.process(request.query)
+    result = await get_pipeline().process(request.query)
     
     return result
 
-# ==================== Startup Event ====================
+@app.post("/process_batch")
+async def process_batch(request: BatchQueryRequest) -> BatchSubmission:
+    """
+    Process many queries in one request.
+    
+    Queries whose latency budget covers the Batch API completion window
+    (24h) are pooled into OpenAI Batch API jobs (50% cheaper): the response
+    returns their query IDs immediately, results are fetched from
+    /process_batch/{query_id}. Smaller budgets are processed directly and
+    returned inline.
+    
+    Automatic error handling as for /process.
+    """
+    
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            f"Received batch: {len(request.queries)} queries, "
+            f"latency budget {request.latency_budget_ms} ms"
+        )
+    
+    return await get_pipeline().process_batch(
+        request.queries,
+        request.latency_budget_ms
+    )
+
+@app.get("/process_batch/{query_id}")
+async def get_batch_result(query_id: str) -> BatchItemStatus:
+    """
+    Status and result of a query submitted to the Batch API.
+    
+    - Unknown or expired query_id → HTTP 404
+    """
+    
+    status = get_pipeline().get_batch_result(query_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Unknown query_id")
+    
+    return status
+
+# ==================== Lifecycle Events ====================
 
 @app.on_event("startup")
 async def startup_event():
@@ -110,3 +165,9 @@ async def startup_event():
     get_pipeline()
     
     logger.info("✅ Server ready")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release pipeline resources on shutdown"""
+    await get_pipeline().close()
+    logger.info("👋 Server stopped")
@@ -36,3 +36,20 @@ class PipelineResult(BaseModel):
     sources: list[str] = []
     processing_time_ms: float = 0.0
     metadata: dict = {}
+
+
+# ==================== Batch Output ====================
+
+class BatchSubmission(BaseModel):
+    """Response of /process_batch"""
+    mode: str  # "direct" (results inline) or "batch" (poll each query_id)
+    results: list[PipelineResult] = []  # Direct mode
+    query_ids: list[str] = []  # Batch mode
+
+
+class BatchItemStatus(BaseModel):
+    """Status of one query submitted to the Batch API"""
+    query_id: str
+    status: str  # "pending", "completed" or "failed"
+    result: PipelineResult | None = None
+    error: str | None = None
@@ -1,7 +1,19 @@
 # pipeline.py
 from validator import Validator
 from processor import Processor
-from models import PipelineResult
+from batch_dispatcher import BatchDispatcher, completion_window_ms
+from embedder import Embedder
+from clients import create_async_client
+from semantic_cache import SemanticCache
+from models import (
+    UserQuery,
+    ProcessorResult,
+    PipelineResult,
+    BatchSubmission,
+    BatchItemStatus
+)
+from config import settings
+import asyncio
 import logging
 import time
 
@@ -24,21 +36,51 @@ class Pipeline:
         self.validator = Validator()
         logger.info("✓ Validator ready")
         
-        self.processor = Processor()
+        # One API client (one connection pool) shared by all components
+        self.client = create_async_client()
+        
+        # Embeddings are needed by the semantic cache and FAISS retrieval
+        if settings.enable_semantic_cache or (
+            settings.enable_retrieval and settings.retrieval_backend == "faiss"
+        ):
+            self.embedder = Embedder(self.client)
+            logger.info("✓ Embedder ready")
+        else:
+            self.embedder = None
+        
+        self.processor = Processor(self.client, self.embedder)
         logger.info("✓ Processor ready")
         
+        self.batch_dispatcher = BatchDispatcher(self.processor)
+        logger.info("✓ Batch dispatcher ready")
+        
+        # Optional: Semantic cache for near-duplicate queries
+        if settings.enable_semantic_cache:
+            self.semantic_cache = SemanticCache()
+            logger.info("✓ Semantic cache ready")
+        else:
+            self.semantic_cache = None
+        
         self.process_step = "0_pipeline"
         
         logger.info("✅ Pipeline initialized successfully")
     
-    def process(self, query: str) -> PipelineResult:
+    async def close(self) -> None:
+        """Stop background batch tasks and release the API client and caches."""
+        await self.batch_dispatcher.close()
+        await self.client.close()
+        if self.embedder is not None:
+            self.embedder.close()
+    
+    async def process(self, query: str) -> PipelineResult:
         """
         Process query through complete pipeline.
         
         Steps:
         1. Validate query (generate ID, check length)
-        2. Process with LLM (optional RAG)
-        3. Format results
+        2. Return cached result for semantically equivalent queries (if enabled)
+        3. Process with LLM (optional RAG)
+        4. Format results
         
         Args:
             query: Raw user query string
@@ -50,26 +92,174 @@ class Pipeline:
             RuntimeError: If any step fails (propagated from components)
         """
         
-        start_time = time.time()
+        start_time = time.perf_counter_ns()
         
-        # Step 1: Validate
+        # Step 1: Validate (before any paid API call)
         validated_query = self.validator.validate(query)
         
-        logger.info(
-            "Pipeline started",
-            extra={
-                "process_step": self.process_step,
-                "query_id": validated_query.query_id
-            }
+        return await self._process_validated(validated_query, start_time)
+    
+    async def _process_validated(
+        self,
+        validated_query: UserQuery,
+        start_time: int
+    ) -> PipelineResult:
+        """Run steps 2-4 of process() for an already validated query."""
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Pipeline started",
+                extra={
+                    "process_step": self.process_step,
+                    "query_id": validated_query.query_id
+                }
+            )
+        
+        # Step 2: Semantic cache lookup (if enabled)
+        query_embedding = None
+        if self.semantic_cache is not None:
+            query_embedding = await self.embedder.embed(validated_query.query)
+            cached_result = self.semantic_cache.lookup(query_embedding)
+            
+            if cached_result is not None:
+                processing_time_ms = (time.perf_counter_ns() - start_time) / 1_000_000
+                
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(
+                        "Pipeline completed (semantic cache hit)",
+                        extra={
+                            "process_step": self.process_step,
+                            "query_id": validated_query.query_id,
+                            "processing_time_ms": round(processing_time_ms, 2)
+                        }
+                    )
+                
+                return cached_result.model_copy(
+                    update={
+                        "query_id": validated_query.query_id,
+                        "query": validated_query.query,
+                        "processing_time_ms": processing_time_ms,
+                        "metadata": {**cached_result.metadata, "semantic_cache_hit": True}
+                    }
+                )
+        
+        # Step 3: Process with LLM
+        processor_result = await self.processor.process(validated_query)
+        
+        # Step 4: Format results
+        processing_time_ms = (time.perf_counter_ns() - start_time) / 1_000_000
+        final_result = self._format_result(
+            validated_query, processor_result, processing_time_ms
         )
         
-        # Step 2: Process with LLM
-        processor_result = self.processor.process(validated_query)
+        if query_embedding is not None:
+            self.semantic_cache.add(query_embedding, final_result)
+        
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Pipeline completed",
+                extra={
+                    "process_step": self.process_step,
+                    "query_id": validated_query.query_id,
+                    "processing_time_ms": round(processing_time_ms, 2)
+                }
+            )
+        
+        return final_result
+    
+    async def process_batch(
+        self,
+        queries: list[str],
+        latency_budget_ms: int
+    ) -> BatchSubmission:
+        """
+        Process many queries, pooling non-interactive ones into the Batch API.
+        
+        Routing:
+        - latency_budget_ms < batch_completion_window: direct LLM calls,
+          results returned inline
+        - Otherwise: queued into OpenAI Batch API jobs (lower cost, up to the
+          completion window of latency); query IDs are returned immediately
+          and results are fetched with get_batch_result()
+        
+        Args:
+            queries: Raw user query strings
+            latency_budget_ms: How long the caller is willing to wait
+            
+        Returns:
+            BatchSubmission with results (direct) or query IDs (batch)
+            
+        Raises:
+            RuntimeError: If any query fails validation, retrieval or (direct) processing
+        """
+        start_time = time.perf_counter_ns()
         
-         # Step 3: Format results
-        processing_time_ms = (time.time() - start_time) * 1000
+        # Validate all queries before any paid API call
+        validated_queries = [self.validator.validate(query) for query in queries]
         
-        final_result = PipelineResult(
+        if latency_budget_ms < completion_window_ms():
+            results = await asyncio.gather(
+                *(self._process_validated(item, start_time) for item in validated_queries)
+            )
+            return BatchSubmission(mode="direct", results=list(results))
+        
+        # Retrieve context for all queries concurrently; queue none unless all succeed
+        prompts = await asyncio.gather(
+            *(self.processor.build_prompt(item) for item in validated_queries)
+        )
+        
+        for item, (user_prompt, context_docs) in zip(validated_queries, prompts):
+            self.batch_dispatcher.submit(item, user_prompt, context_docs)
+        
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Batch queued",
+                extra={
+                    "process_step": self.process_step,
+                    "batch_size": len(validated_queries)
+                }
+            )
+        
+        return BatchSubmission(
+            mode="batch",
+            query_ids=[item.query_id for item in validated_queries]
+        )
+    
+    def get_batch_result(self, query_id: str) -> BatchItemStatus | None:
+        """
+        Look up a query submitted to the Batch API.
+        
+        Args:
+            query_id: ID returned by process_batch
+            
+        Returns:
+            BatchItemStatus, or None if the query ID is unknown or expired
+        """
+        job = self.batch_dispatcher.get(query_id)
+        if job is None:
+            return None
+        
+        if not job.future.done():
+            return BatchItemStatus(query_id=query_id, status="pending")
+        
+        error = job.future.exception()
+        if error is not None:
+            return BatchItemStatus(query_id=query_id, status="failed", error=str(error))
+        
+        processing_time_ms = (job.completed_ns - job.submitted_ns) / 1_000_000
+        return BatchItemStatus(
+            query_id=query_id,
+            status="completed",
+            result=self._format_result(job.item, job.future.result(), processing_time_ms)
+        )
+    
+    def _format_result(
+        self,
+        validated_query: UserQuery,
+        processor_result: ProcessorResult,
+        processing_time_ms: float
+    ) -> PipelineResult:
+        """Build PipelineResult from processor output."""
+        return PipelineResult(
             query_id=processor_result.query_id,
             query=validated_query.query,
             answer=processor_result.answer,
@@ -80,14 +270,3 @@ class Pipeline:
                 "has_context": len(processor_result.sources_used) > 0
             }
         )
-        
-        logger.info(
-            "Pipeline completed",
-            extra={
-                "process_step": self.process_step,
-                "query_id": validated_query.query_id,
-                "processing_time_ms": round(processing_time_ms, 2)
-            }
-        )
-        
-        return final_result
@@ -1,10 +1,16 @@
 # processor.py
 from models import UserQuery, ProcessorResult
-from openai import OpenAI
+from embedder import Embedder
+from openai import AsyncOpenAI
 from config import settings
 from prompts import SYSTEM_PROMPT, SYSTEM_RAG_PROMPT
+from cachetools import TTLCache
+import hashlib
 import logging
 import json
+import threading
+import numpy as np
+import orjson
 
 logger = logging.getLogger(__name__)
 
@@ -18,10 +24,30 @@ class Processor:
     Replaces: classifier, retriever, generator, quality_check, answer_judge
     """
     
-    def __init__(self):
-        self.client = OpenAI(api_key=settings.openai_api_key)
-        self.prompt_template = self._load_system_prompt()
+    def __init__(self, client: AsyncOpenAI, embedder: Embedder | None = None):
+        self.client = client  # Shared with Embedder and BatchDispatcher
+        self.embedder = embedder  # Required for the FAISS retrieval backend
         self.process_step = "2_processor"
+        self.prompt_template = self._load_system_prompt()
+        
+        # Snapshot per-request settings as plain attributes (read on every request)
+        self._model = settings.model_name
+        self._temp = settings.temperature
+        self._max_tok = settings.max_tokens
+        self._top_k = settings.top_k
+        self._rag = settings.enable_retrieval
+        
+        # Prompt parts that never change between requests (built once)
+        self._system_msg = {"role": "system", "content": self.prompt_template.prompt}
+        self._rag_head = "Context:\n"
+        self._rag_mid = "\n\nQuestion: "
+        
+        # Exact-match response cache (bounded, entries expire after TTL)
+        self._response_cache = TTLCache(
+            maxsize=settings.response_cache_maxsize,
+            ttl=settings.response_cache_ttl
+        )
+        self._response_cache_lock = threading.Lock()
         
         # Log prompt metadata
         logger.info(
@@ -47,17 +73,22 @@ class Processor:
             )
         
         # Optional: Load knowledge base if retrieval enabled
+        self.index = None
+        self.vectorizer = None
+        self.doc_matrix = None
         if settings.enable_retrieval:
-            self.knowledge_base = self._load_knowledge_base()
+            self.doc_texts = self._load_knowledge_base()
+            self._build_retrieval_index()
             logger.info(
                 "Knowledge base loaded",
                 extra={
                     "process_step": self.process_step,
-                    "documents_count": len(self.knowledge_base)
+                    "documents_count": len(self.doc_texts),
+                    "retrieval_backend": settings.retrieval_backend
                 }
             )
         else:
-            self.knowledge_base = []
+            self.doc_texts = []
             logger.info(
                 "Retrieval disabled",
                 extra={"process_step": self.process_step}
@@ -95,20 +126,60 @@ class Processor:
         
         return prompt
     
-    def _load_knowledge_base(self) -> list[dict]:
+    def _cache_key(self, user_prompt: str) -> str:
+        """
+        Build exact-match cache key for an LLM request.
+        
+        Args:
+            user_prompt: Final user prompt (including retrieved context)
+            
+        Returns:
+            SHA256 hex digest of model settings, system prompt and user prompt
+        """
+        payload = json.dumps(
+            [
+                self._model,
+                self._temp,
+                self._max_tok,
+                self.prompt_template.prompt,
+                user_prompt
+            ],
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    def _load_knowledge_base(self) -> list[str]:
         """
         Load knowledge base from JSONL file.
         
+        Only the 'text' field is kept: row i of every retrieval index
+        maps directly to doc_texts[i], no per-document dicts are retained.
+        Documents without text are skipped (they cannot be embedded).
+        
         Returns:
-            List of document dictionaries with 'text' field
+            List of document texts
         """
         try:
-            docs = []
-            with open(settings.knowledge_base_path, 'r', encoding='utf-8') as f:
+            doc_texts = []
+            skipped = 0
+            # orjson parses UTF-8 bytes directly (no decode/strip per line)
+            with open(settings.knowledge_base_path, 'rb') as f:
                 for line in f:
-                    doc = json.loads(line.strip())
-                    docs.append(doc)
-            return docs
+                    text = orjson.loads(line).get('text')
+                    if not isinstance(text, str) or not text.strip():
+                        skipped += 1
+                        continue
+                    doc_texts.append(text)
+            
+            if skipped:
+                logger.warning(
+                    "Skipped knowledge base documents without text",
+                    extra={
+                        "process_step": self.process_step,
+                        "skipped_count": skipped
+                    }
+                )
+            return doc_texts
         except FileNotFoundError:
             logger.warning(
                 "Knowledge base file not found",
@@ -126,60 +197,266 @@ class Processor:
             )
             return []
     
-    def _retrieve_context(self, query: str) -> list[str]:
+    def _build_retrieval_index(self) -> None:
+        """
+        Build retrieval index over the knowledge base (once, at load time).
+        
+        Backend is chosen by settings.retrieval_backend:
+        - "faiss": HNSW graph over document embeddings (semantic)
+        - "tfidf": Sparse TF-IDF matrix (keyword, no API calls)
+        
+        Raises:
+            RuntimeError: If retrieval backend is unknown or document embedding fails
+        """
+        if not self.doc_texts:
+            return
+        
+        if settings.retrieval_backend == "faiss":
+            self._build_faiss_index(self.doc_texts)
+        elif settings.retrieval_backend == "tfidf":
+            self._build_tfidf_index(self.doc_texts)
+        else:
+            logger.error(
+                "Unknown retrieval backend",
+                extra={
+                    "process_step": self.process_step,
+                    "retrieval_backend": settings.retrieval_backend
+                }
+            )
+            raise RuntimeError(
+                f"Unknown retrieval backend: {settings.retrieval_backend}"
+            )
+    
+    def _build_faiss_index(self, texts: list[str]) -> None:
+        """
+        Embed all documents and add them to a FAISS HNSW index.
+        
+        Sets:
+            self.index: FAISS IndexHNSWFlat (row i = doc_texts[i])
+        
+        Raises:
+            RuntimeError: If no embedder was provided
+        """
+        if self.embedder is None:
+            logger.error(
+                "FAISS retrieval requires an embedder",
+                extra={"process_step": self.process_step}
+            )
+            raise RuntimeError("FAISS retrieval backend requires an Embedder")
+        
+        import faiss  # Optional dependency: only needed for the FAISS backend
+        
+        embeddings = self.embedder.embed_many(texts)
+        
+        self.index = faiss.IndexHNSWFlat(embeddings.shape[1], settings.hnsw_m)
+        self.index.hnsw.efConstruction = settings.hnsw_ef_construction
+        self.index.hnsw.efSearch = max(settings.hnsw_ef_search, settings.top_k)
+        self.index.add(embeddings)
+    
+    def _build_tfidf_index(self, texts: list[str]) -> None:
         """
-        Simple keyword-based retrieval.
+        Fit TF-IDF vectorizer over all documents.
         
-        Enhancement option: Replace with FAISS vector search for semantic similarity.
+        Sets:
+            self.vectorizer: Fitted TfidfVectorizer
+            self.doc_matrix: Sparse (documents x terms) TF-IDF matrix
+        """
+        # Optional dependency: only needed for the TF-IDF backend
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        
+        try:
+            self.vectorizer = TfidfVectorizer(
+                lowercase=True,
+                stop_words='english',
+                dtype=np.float32
+            )
+            self.doc_matrix = self.vectorizer.fit_transform(texts)
+        except ValueError:
+            # Raised for an empty vocabulary (e.g. only stop words)
+            logger.warning(
+                "Failed to build retrieval index",
+                extra={"process_step": self.process_step},
+                exc_info=True
+            )
+            self.vectorizer = None
+            self.doc_matrix = None
+    
+    async def _retrieve_context(self, query: str) -> list[str]:
+        """
+        Retrieve top-k documents with the configured backend.
         
         Args:
             query: User query
             
         Returns:
             List of relevant document texts
+            
+        Raises:
+            RuntimeError: If query embedding fails (FAISS backend)
         """
-        if not settings.enable_retrieval or not self.knowledge_base:
+        if not self._rag:
             return []
         
-        # Simple keyword matching (can be enhanced with embeddings/FAISS)
-        relevant_docs = []
-        query_lower = query.lower()
-        query_words = set(query_lower.split())
-        
-        # Score documents by keyword overlap
-        scored_docs = []
-        for doc in self.knowledge_base:
-            doc_text = doc.get('text', '')
-            doc_lower = doc_text.lower()
-            doc_words = set(doc_lower.split())
+        if self.index is not None:
+            relevant_docs = await self._search_faiss(query)
+        elif self.vectorizer is not None:
+            relevant_docs = self._search_tfidf(query)
+        else:
+            return []
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Context retrieved",
+                extra={
+                    "process_step": self.process_step,
+                    "documents_found": len(relevant_docs),
+                    "query": query[:50]
+                }
+            )
+        
+        return relevant_docs
+    
+    async def _search_faiss(self, query: str) -> list[str]:
+        """Nearest-neighbor search over document embeddings (HNSW graph)."""
+        query_embedding = await self.embedder.embed(query)
+        _, indices = self.index.search(query_embedding[None, :], self._top_k)
+        
+        # FAISS pads with -1 when fewer than top_k documents exist
+        return [self.doc_texts[i] for i in indices[0] if i >= 0]
+    
+    def _search_tfidf(self, query: str) -> list[str]:
+        """Keyword search via one sparse matrix-vector product."""
+        # Cosine similarity (rows are L2-normalized)
+        query_vec = self.vectorizer.transform([query])
+        scores = (self.doc_matrix @ query_vec.T).toarray().ravel()
+        
+        # Take top-k without sorting the full score array
+        k = min(self._top_k, len(scores))
+        top_idx = np.argpartition(-scores, k - 1)[:k]
+        top_idx = top_idx[np.argsort(-scores[top_idx])]
+        return [
+            self.doc_texts[i]
+            for i in top_idx
+            if scores[i] > 0
+        ]
+    
+    async def build_prompt(self, item: UserQuery) -> tuple[str, list[str]]:
+        """
+        Retrieve context (if enabled) and build the user prompt.
+        
+        Args:
+            item: Validated user query
             
-            # Calculate overlap score
-            overlap = len(query_words & doc_words)
-            if overlap > 0:
-                scored_docs.append((overlap, doc_text))
+        Returns:
+            Tuple of (user prompt, retrieved context documents)
+            
+        Raises:
+            RuntimeError: If retrieval fails
+        """
+        context_docs = await self._retrieve_context(item.query)
         
-        # Sort by score and take top-k
-        scored_docs.sort(reverse=True, key=lambda x: x[0])
-        relevant_docs = [doc_text for score, doc_text in scored_docs[:settings.top_k]]
+        if context_docs:
+            # Instructions live in the system prompt: a static prefix keeps
+            # OpenAI prompt caching effective, volatile context goes last
+            user_prompt = "".join(
+                [self._rag_head, "\n\n".join(context_docs), self._rag_mid, item.query]
+            )
+            
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Using RAG mode",
+                    extra={
+                        "process_step": self.process_step,
+                        "query_id": item.query_id,
+                        "context_docs_count": len(context_docs)
+                    }
+                )
+        else:
+            user_prompt = item.query
+            
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Using direct mode (no RAG)",
+                    extra={
+                        "process_step": self.process_step,
+                        "query_id": item.query_id
+                    }
+                )
         
-        logger.debug(
-            "Context retrieved",
-            extra={
-                "process_step": self.process_step,
-                "documents_found": len(relevant_docs),
-                "query": query[:50]
-            }
-        )
+        return user_prompt, context_docs
+    
+    def build_request(self, user_prompt: str) -> dict:
+        """
+        Build chat completion request body.
         
-        return relevant_docs
+        Shared by direct API calls and the Batch API (JSONL body).
+        
+        Args:
+            user_prompt: Final user prompt
+            
+        Returns:
+            Keyword arguments for chat.completions.create
+        """
+        return {
+            "model": self._model,
+            "messages": [
+                self._system_msg,
+                {"role": "user", "content": user_prompt}
+            ],
+            "temperature": self._temp,
+            "max_tokens": self._max_tok
+        }
+    
+    def parse_answer(self, content: str | None, query_id: str) -> str:
+        """
+        Validate raw LLM message content.
+        
+        Args:
+            content: Message content returned by the LLM
+            query_id: Query ID (for logging)
+            
+        Returns:
+            Stripped, non-empty answer
+            
+        Raises:
+            RuntimeError: If content is missing or empty
+        """
+        try:
+            answer = content.strip()
+            
+            # Validate non-empty response
+            if not answer:
+                raise ValueError("Empty LLM response")
+            
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "LLM response successful",
+                    extra={
+                        "process_step": self.process_step,
+                        "query_id": query_id,
+                        "answer_length": len(answer)
+                    }
+                )
+            
+        except (AttributeError, ValueError) as e:
+            logger.error(
+                "Failed to parse LLM response",
+                extra={
+                    "process_step": self.process_step,
+                    "query_id": query_id
+                }
+            )
+            raise RuntimeError("Error parsing LLM response") from e
+        
+        return answer
     
-    def process(self, item: UserQuery) -> ProcessorResult:
+    async def process(self, item: UserQuery) -> ProcessorResult:
         """
         Process user query with optional RAG.
         
         Steps:
-        1. Retrieve context (if enabled)
-        2. Build prompt with context
+        1. Retrieve context (if enabled) and build prompt
+        2. Return cached answer if the identical request was seen
         3. Call LLM API
         4. Parse and validate response
         
@@ -193,56 +470,45 @@ class Processor:
             RuntimeError: If LLM API call or parsing fails
         """
         
-        logger.info(
-            "Processor started",
-            extra={
-                "process_step": self.process_step,
-                "query_id": item.query_id
-            }
-        )
-        
-        # Step 1: Retrieve context (if enabled)
-        context_docs = self._retrieve_context(item.query)
-        
-        # Step 2: Build prompt with optional context
-        if context_docs:
-            context_text = "\n\n".join(context_docs)
-            user_prompt = f"""Context information:
-{context_text}
-
-Question: {item.query}
-
-Answer based on the context above. If the context doesn't contain relevant information, say so."""
-            
-            logger.debug(
-                "Using RAG mode",
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Processor started",
                 extra={
                     "process_step": self.process_step,
-                    "query_id": item.query_id,
-                    "context_docs_count": len(context_docs)
+                    "query_id": item.query_id
                 }
             )
-        else:
-            user_prompt = item.query
+        
+        # Step 1: Retrieve context and build prompt
+        user_prompt, context_docs = await self.build_prompt(item)
+        
+        # Step 2: Return cached answer for identical requests
+        cache_key = self._cache_key(user_prompt)
+        with self._response_cache_lock:
+            cached = self._response_cache.get(cache_key)
+        
+        if cached is not None:
+            answer, cached_docs = cached
             
-            logger.debug(
-                "Using direct mode (no RAG)",
-                extra={
-                    "process_step": self.process_step,
-                    "query_id": item.query_id
-                }
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "Processor completed (cache hit)",
+                    extra={
+                        "process_step": self.process_step,
+                        "query_id": item.query_id
+                    }
+                )
+            
+            return ProcessorResult(
+                query_id=item.query_id,
+                answer=answer,
+                sources_used=list(cached_docs)
             )
         
         # Step 3: Call LLM API
         try:
-            response = self.client.chat.completions.create(
-                model=settings.model_name,
-                messages=[
-                    {"role": "system", "content": self.prompt_template.prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=settings.temperature,
-                max_tokens=settings.max_tokens
+            response = await self.client.chat.completions.create(
+                **self.build_request(user_prompt)
             )
         except Exception as e:
             logger.error(
@@ -257,22 +523,8 @@ Answer based on the context above. If the context doesn't contain relevant infor
         
         # Step 4: Parse and validate response
         try:
-            answer = response.choices[0].message.content.strip()
-            
-            # Validate non-empty response
-            if not answer:
-                raise ValueError("Empty LLM response")
-            
-            logger.debug(
-                "LLM response successful",
-                extra={
-                    "process_step": self.process_step,
-                    "query_id": item.query_id,
-                    "answer_length": len(answer)
-                }
-            )
-            
-        except (IndexError, AttributeError, ValueError) as e:
+            content = response.choices[0].message.content
+        except (IndexError, AttributeError) as e:
             logger.error(
                 "Failed to parse LLM response",
                 extra={
@@ -282,13 +534,19 @@ Answer based on the context above. If the context doesn't contain relevant infor
             )
             raise RuntimeError("Error parsing LLM response") from e
         
-        logger.info(
-            "Processor completed",
-            extra={
-                "process_step": self.process_step,
-                "query_id": item.query_id
-            }
-        )
+        answer = self.parse_answer(content, item.query_id)
+        
+        with self._response_cache_lock:
+            self._response_cache[cache_key] = (answer, tuple(context_docs))
+        
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Processor completed",
+                extra={
+                    "process_step": self.process_step,
+                    "query_id": item.query_id
+                }
+            )
         
         return ProcessorResult(
             query_id=item.query_id,
@@ -14,9 +14,11 @@ SYSTEM_PROMPT = PromptTemplate(
 
 SYSTEM_RAG_PROMPT = PromptTemplate(
     name="system_rag",
-    version="1.0.0",
-    prompt="""You are a helpful AI assistant with context...""",
-    last_modified=datetime(2026, 1, 22),
+    version="1.1.0",
+    prompt="""You are a helpful AI assistant with context...
+
+When context information is provided, answer based on it. If the context doesn't contain relevant information, say so.""",
+    last_modified=datetime(2026, 10, 15),
     tested_models=["gpt-4o-mini"],
     author="X",
     description="RAG optimized"
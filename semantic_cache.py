@@ -0,0 +1,99 @@
+# semantic_cache.py
+from models import PipelineResult
+from config import settings
+import logging
+import threading
+import time
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class SemanticCache:
+    """
+    Semantic query cache.
+    
+    Stores (embedding, PipelineResult) pairs:
+    - Embeddings are L2-normalized and stacked in one (N, D) float32 array
+    - Lookup is a single matrix-vector product (cosine similarity)
+    - Bounded: oldest entries are overwritten once maxsize is reached
+    - Entries expire after semantic_cache_ttl seconds (treated as misses)
+    """
+    
+    def __init__(self):
+        self.threshold = settings.semantic_cache_threshold
+        self.maxsize = settings.semantic_cache_maxsize
+        self.ttl = settings.semantic_cache_ttl
+        self.process_step = "0_semantic_cache"
+        
+        self._matrix: np.ndarray | None = None  # Allocated on first insert
+        self._results: list[PipelineResult | None] = [None] * self.maxsize
+        self._expires = np.zeros(self.maxsize, dtype=np.float64)  # time.monotonic() deadlines
+        self._size = 0
+        self._next = 0
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    @staticmethod
+    def _normalize(embedding: np.ndarray) -> np.ndarray:
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm > 0 else embedding
+    
+    def lookup(self, embedding: np.ndarray) -> PipelineResult | None:
+        """
+        Find cached result for a semantically equivalent query.
+        
+        Args:
+            embedding: Query embedding
+            
+        Returns:
+            Cached PipelineResult if cosine similarity >= threshold, else None
+        """
+        with self._lock:
+            if self._size == 0:
+                return None
+            
+            sims = self._matrix[:self._size] @ self._normalize(embedding)
+            sims[self._expires[:self._size] <= time.monotonic()] = -np.inf
+            best = int(np.argmax(sims))
+            similarity = float(sims[best])
+            result = self._results[best]
+        
+        if similarity < self.threshold:
+            return None
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Semantic cache hit",
+                extra={
+                    "process_step": self.process_step,
+                    "similarity": round(similarity, 4)
+                }
+            )
+        return result
+    
+    def add(self, embedding: np.ndarray, result: PipelineResult) -> None:
+        """
+        Store a pipeline result under its query embedding.
+        
+        Args:
+            embedding: Query embedding
+            result: Pipeline result to cache
+        """
+        with self._lock:
+            if self._matrix is None:
+                capacity = min(64, self.maxsize)
+                self._matrix = np.empty((capacity, embedding.shape[0]), dtype=np.float32)
+            elif self._next == len(self._matrix) and self._size < self.maxsize:
+                # Grow geometrically until maxsize is reached
+                capacity = min(2 * len(self._matrix), self.maxsize)
+                grown = np.empty((capacity, self._matrix.shape[1]), dtype=np.float32)
+                grown[:self._size] = self._matrix[:self._size]
+                self._matrix = grown
+            
+            self._matrix[self._next] = self._normalize(embedding)
+            self._results[self._next] = result
+            self._expires[self._next] = time.monotonic() + self.ttl
+            self._next = (self._next + 1) % self.maxsize
+            self._size = min(self._size + 1, self.maxsize)
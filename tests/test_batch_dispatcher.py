@@ -0,0 +1,172 @@
+# tests/test_batch_dispatcher.py
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from batch_dispatcher import BatchDispatcher
+from config import settings
+from models import UserQuery
+
+class StubBatchClient:
+    """
+    Async stand-in for the OpenAI files/batches API.
+    
+    Every uploaded request is answered with "answer: <user message>",
+    except custom_ids listed in fail_ids (error line, no response body).
+    """
+    
+    def __init__(self, fail_ids=(), batch_status="completed"):
+        self.fail_ids = set(fail_ids)
+        self.batch_status = batch_status
+        self.uploads: list[list[dict]] = []
+        self.files = SimpleNamespace(create=self._create_file, content=self._content)
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve)
+    
+    async def _create_file(self, file, purpose):
+        _, data = file
+        self.uploads.append([json.loads(line) for line in data.decode().splitlines()])
+        return SimpleNamespace(id=f"file-{len(self.uploads)}")
+    
+    async def _create_batch(self, input_file_id, endpoint, completion_window):
+        return SimpleNamespace(id=input_file_id, status="validating", output_file_id=None)
+    
+    async def _retrieve(self, batch_id):
+        return SimpleNamespace(id=batch_id, status=self.batch_status, output_file_id=batch_id)
+    
+    async def _content(self, file_id):
+        lines = []
+        for request in self.uploads[int(file_id.split("-")[1]) - 1]:
+            if request["custom_id"] in self.fail_ids:
+                lines.append({"custom_id": request["custom_id"], "response": None,
+                              "error": {"code": "server_error"}})
+                continue
+            content = "answer: " + request["body"]["messages"][-1]["content"]
+            lines.append({"custom_id": request["custom_id"], "response": {
+                "status_code": 200,
+                "body": {"choices": [{"message": {"content": content}}]}
+            }})
+        return SimpleNamespace(text="\n".join(json.dumps(line) for line in lines))
+
+class StubProcessor:
+    """Processor without retrieval or API client setup"""
+    
+    def __init__(self, client):
+        self.client = client
+    
+    def build_request(self, user_prompt):
+        return {"model": "test", "messages": [{"role": "user", "content": user_prompt}]}
+    
+    def parse_answer(self, content, query_id):
+        if not content or not content.strip():
+            raise RuntimeError("Error parsing LLM response")
+        return content.strip()
+
+@pytest.fixture(autouse=True)
+def batch_settings(monkeypatch):
+    monkeypatch.setattr(settings, "batch_min_size", 3)
+    monkeypatch.setattr(settings, "batch_window_ms", 60_000)
+    monkeypatch.setattr(settings, "batch_max_size", 50_000)
+    monkeypatch.setattr(settings, "batch_poll_interval_s", 0)
+
+def queries(n: int) -> list[UserQuery]:
+    return [UserQuery(query_id=f"q{i}", query=f"question {i}") for i in range(n)]
+
+async def submit_all(client, items, timeout=2.0):
+    """Submit items and wait until every job is resolved"""
+    dispatcher = BatchDispatcher(StubProcessor(client))
+    for item in items:
+        dispatcher.submit(item, item.query, [])
+    jobs = [dispatcher.get(item.query_id) for item in items]
+    await asyncio.wait_for(asyncio.gather(*(job.future for job in jobs), return_exceptions=True), timeout)
+    return dispatcher, jobs
+
+def test_flushes_by_size_without_waiting_for_window():
+    client = StubBatchClient()
+    _, jobs = asyncio.run(submit_all(client, queries(3)))
+    
+    assert [len(upload) for upload in client.uploads] == [3]
+    assert [job.future.result().answer for job in jobs] == [
+        "answer: question 0", "answer: question 1", "answer: question 2"
+    ]
+
+def test_flushes_by_window(monkeypatch):
+    monkeypatch.setattr(settings, "batch_window_ms", 50)
+    client = StubBatchClient()
+    _, jobs = asyncio.run(submit_all(client, queries(2)))
+    
+    assert [len(upload) for upload in client.uploads] == [2]
+    assert all(job.completed_ns is not None for job in jobs)
+
+def test_drains_whole_queue_into_one_batch():
+    client = StubBatchClient()
+    asyncio.run(submit_all(client, queries(25)))
+    
+    assert [len(upload) for upload in client.uploads] == [25]
+
+def test_caps_batch_at_max_size(monkeypatch):
+    monkeypatch.setattr(settings, "batch_max_size", 4)
+    monkeypatch.setattr(settings, "batch_window_ms", 50)  # Remainder is below batch_min_size
+    client = StubBatchClient()
+    asyncio.run(submit_all(client, queries(10)))
+    
+    assert sorted(len(upload) for upload in client.uploads) == [2, 4, 4]
+
+def test_error_lines_fail_only_their_query():
+    client = StubBatchClient(fail_ids={"q1"})
+    dispatcher, jobs = asyncio.run(submit_all(client, queries(3)))
+    
+    assert isinstance(jobs[1].future.exception(), RuntimeError)
+    assert jobs[0].future.result().answer == "answer: question 0"
+    assert jobs[2].future.result().answer == "answer: question 2"
+    assert dispatcher.get("q1") is jobs[1]
+
+def test_failed_batch_fails_all_queries():
+    client = StubBatchClient(batch_status="expired")
+    _, jobs = asyncio.run(submit_all(client, queries(3)))
+    
+    assert all(isinstance(job.future.exception(), RuntimeError) for job in jobs)
+
+def test_unknown_query_id():
+    dispatcher = BatchDispatcher(StubProcessor(StubBatchClient()))
+    assert dispatcher.get("missing") is None
+
+def test_close_fails_pending_jobs(monkeypatch):
+    monkeypatch.setattr(settings, "batch_poll_interval_s", 3600)
+    
+    async def run():
+        client = StubBatchClient(batch_status="in_progress")
+        dispatcher = BatchDispatcher(StubProcessor(client))
+        for item in queries(3):
+            dispatcher.submit(item, item.query, [])
+        while not client.uploads:
+            await asyncio.sleep(0)
+        await dispatcher.close()
+        return dispatcher.get("q0")
+    
+    job = asyncio.run(run())
+    assert isinstance(job.future.exception(), RuntimeError)
+
+def test_close_fails_undispatched_jobs():
+    async def run():
+        dispatcher = BatchDispatcher(StubProcessor(StubBatchClient()))
+        for item in queries(2):
+            dispatcher.submit(item, item.query, [])
+        await asyncio.wait_for(dispatcher.close(), 1.0)
+        return dispatcher
+    
+    dispatcher = asyncio.run(run())
+    for query_id in ("q0", "q1"):
+        job = dispatcher.get(query_id)
+        assert job.future.done()
+        assert isinstance(job.future.exception(), RuntimeError)
+
+def test_submit_after_close_fails():
+    async def run():
+        dispatcher = BatchDispatcher(StubProcessor(StubBatchClient()))
+        await dispatcher.close()
+        dispatcher.submit(queries(1)[0], "question", [])
+    
+    with pytest.raises(RuntimeError):
+        asyncio.run(run())
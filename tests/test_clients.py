@@ -0,0 +1,26 @@
+# tests/test_clients.py
+import httpx
+
+import clients
+from config import settings
+
+def create_with_h2(monkeypatch, installed: bool) -> dict:
+    """Create a client with h2 (not) installed; return httpx.AsyncClient kwargs"""
+    captured = {}
+    
+    class RecordingAsyncClient(httpx.AsyncClient):
+        def __init__(self, **kwargs):
+            captured.update(kwargs)
+            super().__init__(limits=kwargs["limits"])  # Never needs h2
+    
+    monkeypatch.setattr(settings, "openai_api_key", "test-key")
+    monkeypatch.setattr(clients.importlib.util, "find_spec", lambda name: object() if installed else None)
+    monkeypatch.setattr(clients.httpx, "AsyncClient", RecordingAsyncClient)
+    clients.create_async_client()
+    return captured
+
+def test_uses_http2_when_h2_installed(monkeypatch):
+    assert create_with_h2(monkeypatch, installed=True)["http2"] is True
+
+def test_falls_back_to_http1_without_h2(monkeypatch):
+    assert create_with_h2(monkeypatch, installed=False)["http2"] is False
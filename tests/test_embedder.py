@@ -0,0 +1,117 @@
+# tests/test_embedder.py
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import embedder
+from config import settings
+from embedder import Embedder
+
+class StubEmbeddings:
+    """Records embeddings.create calls and returns one vector per input"""
+    
+    def __init__(self):
+        self.calls = []
+    
+    def create(self, model, input):
+        self.calls.append(list(input))
+        return SimpleNamespace(
+            data=[SimpleNamespace(embedding=[float(len(text)), 1.0]) for text in input]
+        )
+
+class StubOpenAI:
+    """Sync client stand-in (used as a context manager by embed_many)"""
+    
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+
+class StubEncoding:
+    """Whitespace tokenizer standing in for tiktoken (no vocabulary download)"""
+    
+    def encode(self, text):
+        return text.split()
+    
+    def decode(self, tokens):
+        return " ".join(tokens)
+
+@pytest.fixture
+def make_embedder(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "openai_api_key", "test-key")
+    monkeypatch.setattr(settings, "embedding_cache_dir", str(tmp_path / "embeddings"))
+    
+    def _make() -> tuple[Embedder, StubEmbeddings]:
+        instance = Embedder(client=None)  # Async client is unused by embed_many
+        stub = StubEmbeddings()
+        monkeypatch.setattr(embedder, "OpenAI", lambda api_key: StubOpenAI(stub))
+        instance._encoding = StubEncoding()
+        return instance, stub
+    return _make
+
+def test_batches_by_item_limit(make_embedder, monkeypatch):
+    monkeypatch.setattr(embedder, "EMBEDDING_BATCH_SIZE", 2)
+    instance, stub = make_embedder()
+    
+    embeddings = instance.embed_many(["a", "b", "c", "d", "e"])
+    
+    assert embeddings.shape == (5, 2)
+    assert embeddings.dtype == np.float32
+    assert [len(call) for call in stub.calls] == [2, 2, 1]
+
+def test_batches_by_token_limit(make_embedder, monkeypatch):
+    monkeypatch.setattr(settings, "embedding_max_batch_tokens", 5)
+    instance, stub = make_embedder()
+    
+    instance.embed_many(["one two three", "four five", "six"])
+    
+    for call in stub.calls:
+        assert sum(len(instance._encoding.encode(text)) for text in call) <= 5
+    assert [text for call in stub.calls for text in call] == ["one two three", "four five", "six"]
+
+def test_truncates_long_inputs(make_embedder, monkeypatch):
+    monkeypatch.setattr(settings, "embedding_max_input_tokens", 3)
+    instance, stub = make_embedder()
+    
+    instance.embed_many(["one two three four five"])
+    
+    assert len(instance._encoding.encode(stub.calls[0][0])) == 3
+
+def test_cached_texts_are_not_re_embedded(make_embedder):
+    instance, stub = make_embedder()
+    
+    first = instance.embed_many(["a", "b"])
+    second = instance.embed_many(["b", "a", "c"])
+    
+    assert stub.calls == [["a", "b"], ["c"]]
+    np.testing.assert_array_equal(second[:2], first[::-1])
+
+class StubAsyncEmbeddings:
+    def __init__(self):
+        self.calls = 0
+    
+    async def create(self, model, input):
+        self.calls += 1
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[float(len(input)), 1.0])])
+
+def test_embed_uses_memory_then_disk_cache(make_embedder):
+    instance, _ = make_embedder()
+    api = StubAsyncEmbeddings()
+    instance.client = SimpleNamespace(embeddings=api)
+    
+    first = asyncio.run(instance.embed("hello"))
+    again = asyncio.run(instance.embed("hello"))
+    assert api.calls == 1
+    assert again is first  # Served from memory
+    
+    instance._memory.clear()
+    from_disk = asyncio.run(instance.embed("hello"))
+    assert api.calls == 1
+    assert from_disk.dtype == np.float32
+    np.testing.assert_array_equal(from_disk, first)
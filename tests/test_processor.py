@@ -0,0 +1,112 @@
+# tests/test_processor.py
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from config import settings
+from models import UserQuery
+from processor import Processor
+
+class StubChatClient:
+    """Async stand-in for chat.completions that records every request"""
+    
+    def __init__(self):
+        self.requests: list[dict] = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+    
+    async def _create(self, **request):
+        self.requests.append(request)
+        message = SimpleNamespace(content=f"answer {len(self.requests)}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+@pytest.fixture
+def knowledge_base(tmp_path, monkeypatch):
+    """Write doc_texts to a JSONL knowledge base and enable retrieval"""
+    def _write(doc_texts: list[str], backend: str) -> None:
+        path = tmp_path / "kb.jsonl"
+        path.write_text("\n".join(json.dumps({"text": text}) for text in doc_texts))
+        monkeypatch.setattr(settings, "knowledge_base_path", str(path))
+        monkeypatch.setattr(settings, "enable_retrieval", True)
+        monkeypatch.setattr(settings, "retrieval_backend", backend)
+    return _write
+
+def test_faiss_backend_requires_embedder(knowledge_base):
+    knowledge_base(["Reset your password in the settings."], backend="faiss")
+    
+    with pytest.raises(RuntimeError, match="requires an Embedder"):
+        Processor(client=None)
+
+@pytest.fixture
+def processor(monkeypatch):
+    """Processor with a stub client and a settable retrieval result"""
+    monkeypatch.setattr(settings, "enable_retrieval", False)
+    processor = Processor(StubChatClient())
+    processor.context = []
+    
+    async def retrieve(query):
+        return list(processor.context)
+    monkeypatch.setattr(processor, "_retrieve_context", retrieve)
+    return processor
+
+def ask(processor, query_id: str = "q1"):
+    return asyncio.run(processor.process(UserQuery(query_id=query_id, query="How do I log in?")))
+
+def test_identical_request_hits_response_cache(processor):
+    first = ask(processor, "q1")
+    second = ask(processor, "q2")
+    
+    assert len(processor.client.requests) == 1
+    assert second.answer == first.answer
+    assert second.query_id == "q2"
+
+def test_changed_context_or_max_tokens_misses(processor):
+    ask(processor)
+    
+    processor.context = ["Login help lives in the account page."]
+    ask(processor)
+    assert len(processor.client.requests) == 2
+    
+    processor._max_tok += 1
+    ask(processor)
+    assert len(processor.client.requests) == 3
+    assert processor.client.requests[-1]["max_tokens"] == settings.max_tokens + 1
+
+def test_cache_hit_returns_cached_sources(processor):
+    processor.context = ["doc a", "doc b"]
+    ask(processor)
+    cached = ask(processor)
+    
+    assert len(processor.client.requests) == 1
+    assert cached.sources_used == ["doc a", "doc b"]
+
+DOC_TEXTS = [
+    "Shipping takes five business days.",
+    "Reset your password from the login page. Password reset links expire.",
+    "Change your password in account settings.",
+    "Invoices are emailed monthly.",
+]
+
+def test_tfidf_ranks_by_score(knowledge_base, monkeypatch):
+    monkeypatch.setattr(settings, "top_k", 2)
+    knowledge_base(DOC_TEXTS, backend="tfidf")
+    processor = Processor(client=None)
+    
+    # Doc 1 mentions "password" twice and "reset" twice: highest score first
+    assert processor._search_tfidf("password reset") == [DOC_TEXTS[1], DOC_TEXTS[2]]
+
+def test_tfidf_drops_zero_score_docs(knowledge_base, monkeypatch):
+    monkeypatch.setattr(settings, "top_k", 3)
+    knowledge_base(DOC_TEXTS, backend="tfidf")
+    processor = Processor(client=None)
+    
+    assert processor._search_tfidf("invoices") == [DOC_TEXTS[3]]
+    assert processor._search_tfidf("refund") == []
+
+def test_tfidf_top_k_larger_than_corpus(knowledge_base, monkeypatch):
+    monkeypatch.setattr(settings, "top_k", 10)
+    knowledge_base(DOC_TEXTS, backend="tfidf")
+    processor = Processor(client=None)
+    
+    assert processor._search_tfidf("password") == [DOC_TEXTS[1], DOC_TEXTS[2]]
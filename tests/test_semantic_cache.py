@@ -0,0 +1,78 @@
+# tests/test_semantic_cache.py
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+import semantic_cache
+from config import Settings, settings
+from models import PipelineResult
+from semantic_cache import SemanticCache
+
+DIM = 256
+
+def one_hot(i: int) -> np.ndarray:
+    """Orthogonal unit embeddings: cosine similarity 1 with itself, 0 with all others"""
+    v = np.zeros(DIM, dtype=np.float32)
+    v[i] = 1.0
+    return v
+
+def result(i: int) -> PipelineResult:
+    return PipelineResult(query_id=str(i), query=f"q{i}", answer=f"a{i}")
+
+@pytest.fixture
+def make_cache(monkeypatch):
+    def _make(maxsize: int = 100, ttl: int = 3600) -> SemanticCache:
+        monkeypatch.setattr(settings, "semantic_cache_maxsize", maxsize)
+        monkeypatch.setattr(settings, "semantic_cache_ttl", ttl)
+        return SemanticCache()
+    return _make
+
+def test_empty_cache_misses(make_cache):
+    assert make_cache().lookup(one_hot(0)) is None
+
+def test_hit_requires_threshold(make_cache):
+    cache = make_cache()
+    cache.add(one_hot(0), result(0))
+    
+    assert cache.lookup(one_hot(0) * 3).answer == "a0"  # Scale does not matter
+    assert cache.lookup(one_hot(1)) is None
+    
+    # cos = 0.9 < 0.95
+    near = 0.9 * one_hot(0) + np.sqrt(1 - 0.81) * one_hot(1)
+    assert cache.lookup(near) is None
+
+def test_grows_beyond_initial_capacity(make_cache):
+    cache = make_cache(maxsize=200)
+    for i in range(150):
+        cache.add(one_hot(i), result(i))
+    
+    assert len(cache) == 150
+    assert all(cache.lookup(one_hot(i)).answer == f"a{i}" for i in range(150))
+
+def test_wraps_and_overwrites_oldest(make_cache):
+    cache = make_cache(maxsize=3)
+    for i in range(5):
+        cache.add(one_hot(i), result(i))
+    
+    assert len(cache) == 3
+    assert cache.lookup(one_hot(0)) is None
+    assert cache.lookup(one_hot(1)) is None
+    assert [cache.lookup(one_hot(i)).answer for i in (2, 3, 4)] == ["a2", "a3", "a4"]
+
+def test_expired_entries_miss(make_cache, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(semantic_cache.time, "monotonic", lambda: now[0])
+    cache = make_cache(ttl=60)
+    cache.add(one_hot(0), result(0))
+    
+    now[0] += 59
+    cache.add(one_hot(1), result(1))
+    assert cache.lookup(one_hot(0)).answer == "a0"
+    
+    now[0] += 1
+    assert cache.lookup(one_hot(0)) is None
+    assert cache.lookup(one_hot(1)).answer == "a1"
+
+def test_maxsize_must_be_positive():
+    with pytest.raises(ValidationError):
+        Settings(semantic_cache_maxsize=0)
@@ -0,0 +1,43 @@
+# tests/test_validator.py
+import os
+
+import pytest
+from pydantic import ValidationError
+
+import validator
+from config import Settings, settings
+from validator import Validator
+
+def test_ids_are_unique_and_sortable():
+    ids = [validator._fast_id() for _ in range(1000)]
+    
+    assert len(set(ids)) == len(ids)
+    assert ids == sorted(ids)
+    assert all(len(query_id) == 20 for query_id in ids)
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+def test_forked_workers_get_their_own_node():
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.write(write_fd, validator._node.encode())
+        os._exit(0)
+    os.waitpid(pid, 0)
+    child_node = os.read(read_fd, 4).decode()
+    
+    # A fresh 16-bit node collides with the parent's with probability 1/65536
+    assert child_node != validator._node
+
+def test_rejects_out_of_range_length():
+    with pytest.raises(RuntimeError, match="too short"):
+        Validator().validate("  a ")
+    with pytest.raises(RuntimeError, match="too long"):
+        Validator().validate("x" * (settings.max_query_length + 1))
+
+def test_strips_query():
+    assert Validator().validate("  hello  ").query == "hello"
+
+def test_min_query_length_must_be_positive():
+    # validate() builds UserQuery without running its empty-query check
+    with pytest.raises(ValidationError):
+        Settings(min_query_length=0)